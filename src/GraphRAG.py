@@ -1,7 +1,5 @@
-import os
-from dotenv import load_dotenv
+from functools import lru_cache
 from pprint import pprint
-from neo4j import GraphDatabase
 
 from langchain.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
@@ -11,18 +9,31 @@ from neo4j_graphrag.llm import OpenAILLM
 from neo4j_graphrag.generation import GraphRAG, RagTemplate
 from neo4j_graphrag.retrievers import HybridCypherRetriever, HybridRetriever
 
+import numpy as np
+
+import answer_cache
+import retention
 import utils
 
-# Load environment variables
-load_dotenv()
-NEO4J_URI = os.getenv("NEO4J_URI")
-NEO4J_USERNAME = os.getenv("NEO4J_USERNAME")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
 
-# Initialize LLM and embedder
-embedder_model = OpenAIEmbeddings(model="text-embedding-3-large")
-llm_model = OpenAILLM(model_name="gpt-4o-mini", model_params={"temperature": 0})
-chat_llm = ChatOpenAI(model="gpt-4o-mini")  # Optional LangChain LLM
+# Initialize LLM and embedder lazily, once per process
+@lru_cache(maxsize=None)
+def get_embedder_model() -> OpenAIEmbeddings:
+    utils.load_env()
+    return OpenAIEmbeddings(model="text-embedding-3-large")
+
+
+@lru_cache(maxsize=None)
+def get_llm_model() -> OpenAILLM:
+    utils.load_env()
+    return OpenAILLM(model_name="gpt-4o-mini", model_params={"temperature": 0})
+
+
+@lru_cache(maxsize=None)
+def get_chat_llm() -> ChatOpenAI:
+    utils.load_env()
+    return ChatOpenAI(model="gpt-4o-mini")  # Optional LangChain LLM
+
 
 # Number of retrieved items
 TOP_K = 3
@@ -31,7 +42,7 @@ TOP_K = 3
 CONTEXT_CYPHER_QUERY = """
     WITH node AS chunk
     MATCH (chunk)<-[:FROM_CHUNK]-(entity)-[relList*1]-(nb)
-    WHERE NONE(r IN relList WHERE type(r) = "FROM_CHUNK")
+    WHERE NONE(r IN relList WHERE type(r) IN ["FROM_CHUNK", "ON_DAY", "DUE_ON"])
     UNWIND relList AS rel
     WITH collect(DISTINCT chunk) AS chunks, 
          collect(DISTINCT rel) AS rels, 
@@ -39,7 +50,8 @@ CONTEXT_CYPHER_QUERY = """
          collect(DISTINCT nb) AS neighbors
     WITH chunks, rels, 
          [e IN entities + neighbors WHERE size(keys(e)) > 0 | 
-            e.name + " (" + labels(e)[0] + ") → " + apoc.convert.toJson(properties(e))] AS entity_info
+            e.name + " (" + labels(e)[0] + ") → " +
+            apoc.convert.toJson(apoc.map.removeKeys(properties(e), ["ingestionId", "timelineDate"]))] AS entity_info
     RETURN 
         apoc.text.join([c IN chunks | c.text], ' -&- ') + " -&&- " +
         apoc.text.join(entity_info, ' -&- ') + " -&&- " +
@@ -48,45 +60,200 @@ CONTEXT_CYPHER_QUERY = """
     AS info;
 """
 
+# Materialized day summaries of a user in a date range, read through the (Day.user, Day.date) index
+TIMELINE_CYPHER_QUERY = """
+    MATCH (day:Day)
+    WHERE day.user = $user AND day.date >= date($start) AND day.date <= date($end) AND day.itemCount > 0
+    RETURN toString(day.date) AS date, day.summary AS summary
+    ORDER BY day.date
+"""
+
+# Cold tier: archived chunks about the days of the question, through the timeline or their reference date
+ARCHIVE_BY_DATE_QUERY = """
+    MATCH (day:Day)<-[:ON_DAY|DUE_ON]-()-[:FROM_CHUNK]->(c:ArchivedChunk)
+    WHERE day.date >= date($start) AND day.date <= date($end)
+    RETURN elementId(c) AS id, c.embeddingArchive AS embedding
+    UNION
+    MATCH (c:ArchivedChunk)
+    WHERE c.referenceDate >= date($start) AND c.referenceDate <= date($end)
+    RETURN elementId(c) AS id, c.embeddingArchive AS embedding
+"""
+
+# Cold tier: most recent archived chunks, when the question mentions no date
+ARCHIVE_RECENT_QUERY = """
+    MATCH (c:ArchivedChunk)
+    WHERE c.referenceDate IS NOT NULL
+    RETURN elementId(c) AS id, c.embeddingArchive AS embedding
+    ORDER BY c.referenceDate DESC
+    LIMIT $limit
+"""
+
+# Same context expansion as CONTEXT_CYPHER_QUERY, starting from the selected archived chunks
+ARCHIVE_CONTEXT_QUERY = """
+    UNWIND $ids AS id
+    MATCH (node:ArchivedChunk) WHERE elementId(node) = id
+""" + CONTEXT_CYPHER_QUERY
+
+# Below this number of distinct hot context lines, the cold tier is searched too
+MIN_HOT_CONTEXT_ITEMS = 3
+
+# Maximum archived chunks compared with the question when it mentions no date
+ARCHIVE_SCAN_LIMIT = 2000
+
+# Prompt used to generate answers from the graph context
+PROMPT_TEMPLATE = RagTemplate(
+    template="""
+    Answer the Question using the following Context. 
+    # Question:
+    {query_text}
+
+    # Context:
+    {context}
+
+    # Answer:
+    """,
+    expected_inputs=["query_text", "context"]
+)
+
+
+@lru_cache(maxsize=None)
+def get_graphRAG_retriever() -> HybridCypherRetriever:
+    """
+    Build the HybridCypherRetriever on first use and reuse it across questions.
+    The retriever reads the index metadata from Neo4j when created, so caching it
+    saves a database round trip per question.
+
+    Returns:
+        Retriever combining hybrid search with the custom Cypher context query.
+    """
+    return HybridCypherRetriever(
+        driver=utils.get_driver(),
+        vector_index_name="textChuck",
+        fulltext_index_name="textFulltext",
+        retrieval_query=CONTEXT_CYPHER_QUERY,
+        embedder=get_embedder_model(),
+    )
+
 
-def answer_graphRAG(question: str) -> str:
+@lru_cache(maxsize=None)
+def get_RAG_retriever() -> HybridRetriever:
+    """
+    Build the standard HybridRetriever on first use and reuse it across questions.
+
+    Returns:
+        Retriever returning raw text chunks.
+    """
+    return HybridRetriever(
+        driver=utils.get_driver(),
+        vector_index_name="textChuck",
+        fulltext_index_name="textFulltext",
+        embedder=get_embedder_model(),
+    )
+
+
+def answer_graphRAG(question: str, user_name: str = None) -> str:
     """
     Answer a question using HybridCypherRetriever and a custom Cypher-based context query.
 
+    When the user is known, near-identical questions asked since the last write to the
+    graph are answered from answer_cache. The question embedding computed for the
+    cache lookup is reused by the retriever.
+
     Args:
         question: The user's question in natural language.
+        user_name: The user asking; None disables the answer cache.
 
     Returns:
         Generated answer using GraphRAG.
     """
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+    query_vector = get_embedder_model().embed_query(question)
 
-    retriever = HybridCypherRetriever(
-        driver=driver,
-        vector_index_name="textChuck",
-        fulltext_index_name="textFulltext",
-        retrieval_query=CONTEXT_CYPHER_QUERY,
-        embedder=embedder_model,
-    )
+    if user_name is not None:
+        version = utils.get_graph_version()
+        temporal = utils.temporal_facts(question)
+        cached_answer = answer_cache.lookup(user_name, version, query_vector, temporal)
+        if cached_answer is not None:
+            return cached_answer
 
-    prompt_template = RagTemplate(
-        template="""
-        Answer the Question using the following Context. 
-        # Question:
-        {query_text}
+    answer = generate_answer(question, retrieve_graphRAG_context(question, query_vector))
 
-        # Context:
-        {context}
+    if user_name is not None:
+        answer_cache.store(user_name, version, query_vector, temporal, answer)
+    return answer
 
-        # Answer:
-        """,
-        expected_inputs=["query_text", "context"]
-    )
 
-    rag = GraphRAG(retriever=retriever, llm=llm_model, prompt_template=prompt_template)
-    response = rag.search(query_text=question, retriever_config={"top_k": TOP_K})
-    driver.close()
-    return response.answer
+def generate_answer(question: str, context: list) -> str:
+    """
+    Generate an answer from already retrieved context, with the GraphRAG prompt.
+
+    Args:
+        question: The user's question in natural language.
+        context: Context strings, one per retrieved item.
+
+    Returns:
+        Generated answer.
+    """
+    prompt = PROMPT_TEMPLATE.format(query_text=question, context="\n".join(context), examples="")
+    response = get_llm_model().invoke(prompt, system_instruction=PROMPT_TEMPLATE.system_instructions)
+    return response.content
+
+
+def retrieve_graphRAG_context(question: str, query_vector: list) -> list:
+    """
+    Retrieve the GraphRAG context from the hot tier, adding the cold tier only when needed:
+    the hot context is too small, or the question is about days older than the retention horizon.
+
+    Args:
+        question: The user's question in natural language.
+        query_vector: Embedding of the question.
+
+    Returns:
+        Raw context strings in the CONTEXT_CYPHER_QUERY format.
+    """
+    response = get_graphRAG_retriever().search(query_text=question, query_vector=query_vector, top_k=TOP_K)
+    context = [item.content for item in response.items]
+
+    hot_items = sum(len(utils.extract_unique_chunks(content)) for content in context)
+    dates = utils.extract_dates(question)
+    targets_archive = bool(dates) and min(dates) < retention.get_archive_cutoff()
+
+    if hot_items < MIN_HOT_CONTEXT_ITEMS or targets_archive:
+        context += get_archive_context(question, query_vector)
+    return context
+
+
+def get_archive_context(question: str, query_vector: list) -> list:
+    """
+    Search the archived chunks (cold tier) and expand the best ones as GraphRAG does.
+
+    Candidates are the archived chunks about the days mentioned in the question, or the
+    most recent ones if it mentions none; they are ranked by cosine similarity with their
+    compressed embeddings.
+
+    Args:
+        question: The user's question in natural language.
+        query_vector: Embedding of the question.
+
+    Returns:
+        Raw context strings in the CONTEXT_CYPHER_QUERY format, empty if nothing is archived.
+    """
+    dates = utils.extract_dates(question)
+    with utils.get_driver().session() as session:
+        if dates:
+            records = list(session.run(ARCHIVE_BY_DATE_QUERY, start=min(dates).isoformat(), end=max(dates).isoformat()))
+        else:
+            records = list(session.run(ARCHIVE_RECENT_QUERY, limit=ARCHIVE_SCAN_LIMIT))
+        records = [record for record in records if record["embedding"]]
+        if not records:
+            return []
+
+        embeddings = np.stack([utils.decompress_embedding(record["embedding"]) for record in records])
+        query = np.asarray(query_vector, dtype=np.float32)
+        scores = embeddings @ query / (np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query) + 1e-12)
+        best = np.argsort(-scores)[:TOP_K]
+
+        ids = [records[index]["id"] for index in best]
+        return [record["info"] for record in session.run(ARCHIVE_CONTEXT_QUERY, ids=ids)]
 
 
 def answer_RAG(question: str) -> str:
@@ -99,18 +266,8 @@ def answer_RAG(question: str) -> str:
     Returns:
         Answer string.
     """
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
-
-    retriever = HybridRetriever(
-        driver=driver,
-        vector_index_name="textChuck",
-        fulltext_index_name="textFulltext",
-        embedder=embedder_model,
-    )
-
-    rag = GraphRAG(retriever=retriever, llm=llm_model)
+    rag = GraphRAG(retriever=get_RAG_retriever(), llm=get_llm_model())
     response = rag.search(query_text=question, retriever_config={"top_k": TOP_K})
-    driver.close()
     return response.answer
 
 
@@ -119,7 +276,8 @@ def get_graphRAG_context(question: str) -> list:
     Retrieve the structured knowledge graph context used by GraphRAG (nodes, properties, relationships).
 
     This function uses a HybridCypherRetriever with a custom Cypher query to retrieve
-    a multi-hop subgraph relevant to the question. The raw result is then cleaned and deduplicated.
+    a multi-hop subgraph relevant to the question, falling back to the archived chunks
+    like answer_graphRAG. The raw result is then cleaned and deduplicated.
 
     Args:
         question: The user query in natural language.
@@ -127,21 +285,12 @@ def get_graphRAG_context(question: str) -> list:
     Returns:
         A list of structured context elements extracted from the knowledge graph.
     """
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+    raw_context = retrieve_graphRAG_context(question, get_embedder_model().embed_query(question))
 
-    retriever = HybridCypherRetriever(
-        driver=driver,
-        vector_index_name="textChuck",
-        fulltext_index_name="textFulltext",
-        retrieval_query=CONTEXT_CYPHER_QUERY,
-        embedder=embedder_model,
-    )
-
-    response = retriever.search(query_text=question, top_k=TOP_K)
-    driver.close()
-
-    raw_context = response.items[0].content
-    return utils.extract_unique_chunks(raw_context)
+    unique_chunks = []
+    for content in raw_context:
+        unique_chunks += [chunk for chunk in utils.extract_unique_chunks(content) if chunk not in unique_chunks]
+    return unique_chunks
 
 
 def get_RAG_context(question: str) -> list:
@@ -157,17 +306,7 @@ def get_RAG_context(question: str) -> list:
     Returns:
         A list of raw user input texts retrieved as RAG context.
     """
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
-
-    retriever = HybridRetriever(
-        driver=driver,
-        vector_index_name="textChuck",
-        fulltext_index_name="textFulltext",
-        embedder=embedder_model,
-    )
-
-    response = retriever.search(query_text=question, top_k=TOP_K)
-    driver.close()
+    response = get_RAG_retriever().search(query_text=question, top_k=TOP_K)
 
     text_inputs = []
     for item in response.items:
@@ -178,4 +317,50 @@ def get_RAG_context(question: str) -> list:
         except IndexError:
             continue  
 
-    return text_inputs
\ No newline at end of file
+    return text_inputs
+
+
+def get_timeline_context(question: str, user_name: str) -> list:
+    """
+    Retrieve the precomputed summaries of the user's days mentioned in the question.
+
+    A single date selects that day, several dates select the range between the
+    earliest and the latest one. The question is expected to have absolute dates
+    already (see utils.process_date).
+
+    Args:
+        question: The user query in natural language.
+        user_name: Owner of the timeline.
+
+    Returns:
+        A list of "date: summary" strings, empty if the user is unknown, the question
+        mentions no date or nothing is recorded on those days.
+    """
+    dates = utils.extract_dates(question)
+    if user_name is None or not dates:
+        return []
+
+    with utils.get_driver().session() as session:
+        records = session.run(TIMELINE_CYPHER_QUERY, user=user_name,
+                              start=min(dates).isoformat(), end=max(dates).isoformat())
+        return [f"{record['date']}: {record['summary']}" for record in records]
+
+
+def answer_timeline(question: str, user_name: str = None) -> str:
+    """
+    Answer day and date-range questions (e.g. "What is planned on 2023-10-24?")
+    from the user's materialized Day nodes, falling back to answer_graphRAG when the
+    user is unknown, the question mentions no date or the timeline has nothing for it.
+
+    Args:
+        question: The user's question in natural language, with absolute dates.
+        user_name: The user asking; also forwarded to answer_graphRAG for its answer cache.
+
+    Returns:
+        Generated answer.
+    """
+    context = get_timeline_context(question, user_name)
+    if not context:
+        return answer_graphRAG(question, user_name=user_name)
+
+    return generate_answer(question, context)
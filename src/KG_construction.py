@@ -1,7 +1,7 @@
-import os
-from dotenv import load_dotenv
-from neo4j import GraphDatabase
+from functools import lru_cache
+import uuid
 import ontology_parser as ontology_parser  
+import utils
 from neo4j_graphrag.llm import OpenAILLM
 from neo4j_graphrag.embeddings.openai import OpenAIEmbeddings
 from neo4j_graphrag.experimental.components.embedder import TextChunkEmbedder
@@ -9,50 +9,175 @@ from neo4j_graphrag.experimental.components.entity_relation_extractor import (
     LLMEntityRelationExtractor,
     OnError,
 )
-from neo4j_graphrag.experimental.components.kg_writer import Neo4jWriter
+from neo4j_graphrag.experimental.components.kg_writer import KGWriterModel, Neo4jWriter
 from neo4j_graphrag.experimental.components.schema import SchemaBuilder
 from neo4j_graphrag.experimental.components.text_splitters.fixed_size_splitter import FixedSizeSplitter
 from neo4j_graphrag.experimental.components.resolver import SinglePropertyExactMatchResolver
+from neo4j_graphrag.experimental.components.types import LexicalGraphConfig, Neo4jGraph
 from neo4j_graphrag.experimental.pipeline import Pipeline
+from pydantic import validate_call
 
-# Load environment variables
-load_dotenv()
-NEO4J_URI = os.getenv("NEO4J_URI")
-NEO4J_USERNAME = os.getenv("NEO4J_USERNAME")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
-ONTOLOGY_FILE = os.getenv("ONTOLOGY_FILE")
-
-# Setup the LLM and Embedding model
-llm = OpenAILLM(
-    model_name="gpt-4o",
-    model_params={"response_format": {"type": "json_object"}},
-)
-embedding_model = OpenAIEmbeddings(model="text-embedding-3-large")
 
+# Setup the LLM and Embedding model lazily, once per process
+@lru_cache(maxsize=None)
+def get_llm() -> OpenAILLM:
+    utils.load_env()
+    return OpenAILLM(
+        model_name="gpt-4o",
+        model_params={"response_format": {"type": "json_object"}},
+    )
+
+
+@lru_cache(maxsize=None)
+def get_embedding_model() -> OpenAIEmbeddings:
+    utils.load_env()
+    return OpenAIEmbeddings(model="text-embedding-3-large")
+
+
+@lru_cache(maxsize=None)
+def get_schema() -> dict:
+    """
+    Parse the ontology on first use and reuse the resulting schema for every insertion.
+
+    Returns:
+        Schema dictionary with entities, relations and potential schema.
+    """
+    return ontology_parser.parse_ontology(utils.get_env("ONTOLOGY_FILE"))
+
+
+class IngestionNeo4jWriter(Neo4jWriter):
+    """
+    Neo4jWriter that stamps every node it writes with the id of the current insertion,
+    so that the chunks and entities of that insertion can be found again through an index.
+    """
+
+    def __init__(self, driver, ingestion_id: str):
+        super().__init__(driver=driver)
+        self.ingestion_id = ingestion_id
 
-async def add_user_input_to_kg(user_input: str):
+    @validate_call
+    async def run(self, graph: Neo4jGraph,
+                  lexical_graph_config: LexicalGraphConfig = LexicalGraphConfig()) -> KGWriterModel:
+        for node in graph.nodes:
+            node.properties["ingestionId"] = self.ingestion_id
+        return await super().run(graph, lexical_graph_config)
+
+
+# Dated entities written by one insertion
+TIMELINE_CANDIDATES_QUERY = """
+    MATCH (n:__Entity__ {ingestionId: $ingestion})
+    WHERE (n:Activity OR n:Event OR n:RoutineActivity OR n:Project)
+      AND coalesce(n.onDate, n.atTime, n.dueDate) IS NOT NULL
+    RETURN elementId(n) AS id, n:Project AS isProject,
+           n.onDate AS onDate, n.atTime AS atTime, n.dueDate AS dueDate
+"""
+
+# Activities and events are linked to the day they happen on, projects to the day they are due
+TIMELINE_LINK_QUERY = """
+    UNWIND $links AS link
+    MATCH (n) WHERE elementId(n) = link.id
+    SET n.timelineDate = link.date
+    WITH n, link
+    WHERE link.date <> ""
+    MERGE (day:Day {user: $user, date: date(link.date)})
+    FOREACH (_ IN CASE WHEN link.isProject THEN [1] ELSE [] END | MERGE (n)-[:DUE_ON]->(day))
+    FOREACH (_ IN CASE WHEN link.isProject THEN [] ELSE [1] END | MERGE (n)-[:ON_DAY]->(day))
+"""
+
+# Precomputed, human readable summary of everything attached to a day of a user
+DAY_SUMMARY_QUERY = """
+    UNWIND $dates AS d
+    MATCH (day:Day {user: $user, date: date(d)})
+    OPTIONAL MATCH (day)<-[r:ON_DAY|DUE_ON]-(n)
+    OPTIONAL MATCH (n)-[:occursAt]->(place)
+    WITH day, r, n, collect(DISTINCT place.name) AS places
+    ORDER BY toString(n.atTime)
+    WITH day, collect(DISTINCT CASE
+        WHEN n IS NULL THEN NULL
+        WHEN type(r) = "DUE_ON" THEN "Deadline of project " + n.name
+        ELSE [l IN labels(n) WHERE NOT l STARTS WITH "__"][0] + ": " + n.name
+             + coalesce(" at " + toString(n.atTime), "")
+             + CASE WHEN size(places) > 0 THEN " in " + apoc.text.join(places, ", ") ELSE "" END
+             + coalesce(" (" + n.description + ")", "")
+             + coalesce(" [status: " + n.status + "]", "")
+    END) AS items
+    SET day.summary = apoc.text.join(items, " -&- "),
+        day.itemCount = size(items)
+"""
+
+
+def update_timeline(ingestion_id: str, user_name: str) -> list:
+    """
+    Attach the activities, events and project deadlines written by one insertion to
+    the user's Day nodes and refresh the summaries of the days that changed.
+
+    The entities are found through the ingestionId index, so the cost of each call
+    depends on the size of the insertion, not on the size of the graph.
+
+    Args:
+        ingestion_id: Id stamped on the written nodes by IngestionNeo4jWriter.
+        user_name: Owner of the timeline.
+
+    Returns:
+        Sorted list of the ISO dates whose summary was updated.
+    """
+    with utils.get_driver().session() as session:
+        records = list(session.run(TIMELINE_CANDIDATES_QUERY, ingestion=ingestion_id))
+
+        links = []
+        for record in records:
+            value = record["dueDate"] if record["isProject"] else record["onDate"] or record["atTime"]
+            day = utils.parse_date(value)
+            links.append({
+                "id": record["id"],
+                "isProject": record["isProject"],
+                # Unparsable dates are marked as processed with an empty date
+                "date": day.isoformat() if day else "",
+            })
+
+        dates = sorted({link["date"] for link in links if link["date"]})
+        if links:
+            session.run(TIMELINE_LINK_QUERY, links=links, user=user_name)
+        if dates:
+            session.run(DAY_SUMMARY_QUERY, dates=dates, user=user_name)
+    return dates
+
+
+# Record when and for which day the chunks of an insertion were written, for the retention tiers
+TAG_CHUNKS_QUERY = """
+    MATCH (c:Chunk {ingestionId: $ingestion})
+    SET c.ingestedAt = datetime(),
+        c.user = $user,
+        c.referenceDate = CASE WHEN $date IS NULL THEN date() ELSE date($date) END
+"""
+
+async def add_user_input_to_kg(user_input: str, user_name: str = None, reference_date: str = None):
     """
     Extracts structured knowledge from user input using a GraphRAG pipeline 
-    and writes it to the Neo4j Knowledge Graph.
+    and writes it to the Neo4j Knowledge Graph. The new chunks are tagged with their
+    reference date, dated entities are linked to the user's Day nodes (only when the
+    user is known), and the graph version is increased.
     
     Args:
         user_input: Raw natural language input provided by the user.
+        user_name: Author of the input; if None, the input is not linked to a timeline.
+        reference_date: ISO date the input refers to, used to age its chunks; today if None.
 
     Returns:
         Pipeline execution result containing extracted graph data.
     """
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+    ingestion_id = uuid.uuid4().hex
     pipeline = Pipeline()
 
     # Add pipeline components
     pipeline.add_component(FixedSizeSplitter(chunk_size=4000, chunk_overlap=200), "splitter")
-    pipeline.add_component(TextChunkEmbedder(embedder=embedding_model), "embedder")
+    pipeline.add_component(TextChunkEmbedder(embedder=get_embedding_model()), "embedder")
     pipeline.add_component(SchemaBuilder(), "schema")
     pipeline.add_component(
-        LLMEntityRelationExtractor(llm=llm, on_error=OnError.IGNORE),
+        LLMEntityRelationExtractor(llm=get_llm(), on_error=OnError.IGNORE),
         "extractor"
     )
-    pipeline.add_component(Neo4jWriter(driver=driver), "writer")
+    pipeline.add_component(IngestionNeo4jWriter(driver=utils.get_driver(), ingestion_id=ingestion_id), "writer")
 
     # Define pipeline flow
     pipeline.connect("splitter", "embedder", input_config={"text_chunks": "splitter"})
@@ -62,7 +187,7 @@ async def add_user_input_to_kg(user_input: str):
 
     # Prepare input data
     clean_input = user_input.replace("\n", " ")
-    schema = ontology_parser.parse_ontology(ONTOLOGY_FILE)
+    schema = get_schema()
 
     pipeline_inputs = {
         "splitter": {"text": clean_input},
@@ -71,10 +196,98 @@ async def add_user_input_to_kg(user_input: str):
 
     # Execute pipeline
     response = await pipeline.run(pipeline_inputs)
-    driver.close()
+
+    with utils.get_driver().session() as session:
+        session.run(TAG_CHUNKS_QUERY, ingestion=ingestion_id, user=user_name, date=reference_date)
+
+    # Keep the materialized timeline and the answer cache in sync with the new entities
+    if user_name is not None:
+        update_timeline(ingestion_id, user_name)
+    utils.bump_graph_version()
     return response.result
 
 
+# Previous entries of the same user and reference date (exact and near-duplicate candidates)
+ENTRY_LEDGER_QUERY = """
+    MATCH (e:DiaryEntry {user: $user, date: $date})
+    RETURN e.key AS key, e.signature AS signature, e.temporal AS temporal
+"""
+
+# Checkpoint of an entry whose extraction has been written to the graph
+RECORD_ENTRY_QUERY = """
+    MERGE (e:DiaryEntry {key: $key})
+    SET e.user = $user, e.date = $date, e.signature = $signature, e.temporal = $temporal,
+        e.ingestedAt = datetime()
+"""
+
+# Estimated Jaccard similarity above which an entry is flagged as a possible duplicate
+NEAR_DUPLICATE_THRESHOLD = 0.9
+
+
+class NearDuplicateEntry(Exception):
+    """
+    Raised by ingest_entry when an entry closely matches one already saved for the same user and day.
+    The entry is not inserted; call ingest_entry again with force=True once the user confirms it.
+    """
+
+    def __init__(self, user_input: str, similarity: float):
+        super().__init__(f"Entry is {similarity:.0%} similar to one already saved for that day")
+        self.user_input = user_input
+        self.similarity = similarity
+
+
+async def ingest_entry(user_input: str, user_name: str, reference_date: str,
+                       near_duplicate_threshold: float = NEAR_DUPLICATE_THRESHOLD, force: bool = False):
+    """
+    Idempotently add a raw diary entry to the Knowledge Graph.
+
+    The entry is identified by the hash of its normalized text, the user and the reference date.
+    Entries already in the ledger are skipped before any LLM or embedding call. Near-duplicates
+    (MinHash) of an entry of the same user and day that mention the same dates and times are
+    not skipped but flagged, so that the caller can ask the user; entries whose dates or times
+    differ (e.g. a rescheduled appointment) are always inserted. Successful insertions are
+    recorded in the ledger, so re-running a bulk load resumes after the last ingested entry.
+
+    Args:
+        user_input: Raw natural language input, before temporal normalization.
+        user_name: The user's name.
+        reference_date: Date of reference for temporal normalization.
+        near_duplicate_threshold: Minimum estimated similarity to flag the entry as a possible duplicate.
+        force: Insert near-duplicates, e.g. after the user confirmed them.
+
+    Returns:
+        Pipeline execution result, or None if the entry was already ingested.
+
+    Raises:
+        NearDuplicateEntry: If the entry is a near-duplicate and force is False.
+    """
+    day = utils.parse_date(reference_date)
+    reference_day = day.isoformat() if day else str(reference_date)
+    key = utils.entry_key(user_input, user_name, reference_day)
+
+    with utils.get_driver().session() as session:
+        ledger = list(session.run(ENTRY_LEDGER_QUERY, user=user_name, date=reference_day))
+    if any(record["key"] == key for record in ledger):
+        return None
+
+    signature = utils.minhash_signature(user_input)
+    temporal = utils.temporal_facts(user_input)
+    previous = [record["signature"] for record in ledger
+                if record["signature"] and record["temporal"] == temporal]
+    similarity = utils.max_minhash_similarity(signature, previous)
+    if similarity >= near_duplicate_threshold and not force:
+        raise NearDuplicateEntry(user_input, similarity)
+
+    processed_input = utils.process_text(text=user_input, current_date=reference_date, user_name=user_name)
+    result = await add_user_input_to_kg(processed_input, user_name=user_name,
+                                        reference_date=day.isoformat() if day else None)
+
+    with utils.get_driver().session() as session:
+        session.run(RECORD_ENTRY_QUERY, key=key, user=user_name, date=reference_day,
+                    signature=signature, temporal=temporal)
+    return result
+
+
 async def resolve_kg_entities():
     """
     Resolves nodes in the Neo4j graph using exact match logic based on single properties.
@@ -82,8 +295,8 @@ async def resolve_kg_entities():
     Returns:
         List of updated or merged entities.
     """
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
-    resolver = SinglePropertyExactMatchResolver(driver)
+    resolver = SinglePropertyExactMatchResolver(utils.get_driver())
     result = await resolver.run()
-    driver.close()
+
+    utils.bump_graph_version()
     return result
\ No newline at end of file
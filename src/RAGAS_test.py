@@ -1,9 +1,8 @@
-from dotenv import load_dotenv
+from functools import lru_cache
 
 from ragas import EvaluationDataset, evaluate
 from ragas.llms import LangchainLLMWrapper
 from ragas.embeddings import LangchainEmbeddingsWrapper
-from ragas.testset import TestsetGenerator
 from ragas.metrics import (
     LLMContextPrecisionWithReference,
     ContextRecall,
@@ -13,17 +12,22 @@ from ragas.metrics import (
 )
 
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.document_loaders import DirectoryLoader
 
-import GraphRAG  
+import GraphRAG
+import utils
 
-# Load environment variables
-load_dotenv()
 
-# Model and Wrapper Initialization
-llm = ChatOpenAI(model="gpt-4o-mini")
-llm_wrapper = LangchainLLMWrapper(llm)
-embedding_wrapper = LangchainEmbeddingsWrapper(OpenAIEmbeddings(model="text-embedding-3-large"))
+# Model and Wrapper Initialization, deferred to first use
+@lru_cache(maxsize=None)
+def get_llm_wrapper() -> LangchainLLMWrapper:
+    utils.load_env()
+    return LangchainLLMWrapper(ChatOpenAI(model="gpt-4o-mini"))
+
+
+@lru_cache(maxsize=None)
+def get_embedding_wrapper() -> LangchainEmbeddingsWrapper:
+    utils.load_env()
+    return LangchainEmbeddingsWrapper(OpenAIEmbeddings(model="text-embedding-3-large"))
 
 
 def create_evaluation_dataset(path: str):
@@ -36,10 +40,14 @@ def create_evaluation_dataset(path: str):
     Returns:
         Uploaded EvaluationDataset object.
     """
+    # Heavy optional dependencies, only needed when generating a new test set
+    from langchain_community.document_loaders import DirectoryLoader
+    from ragas.testset import TestsetGenerator
+
     loader = DirectoryLoader(path, glob="**/[!.]*")
     documents = loader.load()
 
-    generator = TestsetGenerator(llm_wrapper, embedding_wrapper)
+    generator = TestsetGenerator(get_llm_wrapper(), get_embedding_wrapper())
     dataset = generator.generate_with_langchain_docs(documents, testset_size=10)
     dataset.upload()
 
@@ -80,9 +88,9 @@ def evaluate_graphRAG(data_test: list):
             ContextRecall(),
             ResponseRelevancy(),
             Faithfulness(),
-            SemanticSimilarity(embeddings=embedding_wrapper)
+            SemanticSimilarity(embeddings=get_embedding_wrapper())
         ],
-        llm=llm_wrapper
+        llm=get_llm_wrapper()
     )
 
     #evaluation_result.upload()
@@ -123,9 +131,9 @@ def evaluate_RAG(data_test: list):
             ContextRecall(),
             ResponseRelevancy(),
             Faithfulness(),
-            SemanticSimilarity(embeddings=embedding_wrapper)
+            SemanticSimilarity(embeddings=get_embedding_wrapper())
         ],
-        llm=llm_wrapper
+        llm=get_llm_wrapper()
     )
 
     #evaluation_result.upload()
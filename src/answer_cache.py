@@ -0,0 +1,121 @@
+import threading
+import numpy as np
+
+# Minimum cosine similarity between two questions to reuse an answer
+SIMILARITY_THRESHOLD = 0.95
+
+# Maximum number of cached answers per user, the oldest are dropped first
+MAX_ENTRIES_PER_USER = 256
+
+# Answers are kept per user, but any write to the graph invalidates all of them (retrieval is
+# not scoped by user): the cache only pays off in read-heavy, single-user deployments.
+
+_lock = threading.Lock()
+_caches = {}
+_metrics = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _new_cache(version: int, dimensions: int) -> dict:
+    return {
+        "version": version,
+        "embeddings": np.empty((0, dimensions), dtype=np.float32),
+        "temporal": [],
+        "answers": [],
+    }
+
+
+def lookup(user_name: str, version: int, embedding: list, temporal: list,
+           threshold: float = SIMILARITY_THRESHOLD):
+    """
+    Return the cached answer of the most similar past question of a user, if similar enough.
+
+    Only past questions about the same dates and times can match, so that the answer about
+    one day is never served for a question about another day.
+
+    The user's cache is emptied when the graph version differs from the one its answers were
+    computed with, i.e. when the graph has been written since.
+
+    Args:
+        user_name: The user's name.
+        version: Current graph version (see utils.get_graph_version).
+        embedding: Embedding of the question.
+        temporal: Temporal facts of the question (see utils.temporal_facts).
+        threshold: Minimum cosine similarity for a hit.
+
+    Returns:
+        The cached answer, or None on a miss.
+    """
+    query = np.asarray(embedding, dtype=np.float32)
+    query = query / (np.linalg.norm(query) or 1.0)
+
+    with _lock:
+        cache = _caches.get(user_name)
+        if cache is not None and cache["version"] != version:
+            _metrics["invalidations"] += 1
+            cache = _caches[user_name] = _new_cache(version, len(query))
+
+        if cache is None or not cache["answers"]:
+            _metrics["misses"] += 1
+            return None
+
+        same_dates = np.array([facts == temporal for facts in cache["temporal"]])
+        similarities = np.where(same_dates, cache["embeddings"] @ query, -1.0)
+        best = int(np.argmax(similarities))
+        if similarities[best] < threshold:
+            _metrics["misses"] += 1
+            return None
+
+        _metrics["hits"] += 1
+        return cache["answers"][best]
+
+
+def store(user_name: str, version: int, embedding: list, temporal: list, answer: str):
+    """
+    Cache the answer to a question, tagged with the graph version it was computed with.
+
+    Args:
+        user_name: The user's name.
+        version: Graph version read before the answer was computed.
+        embedding: Embedding of the question.
+        temporal: Temporal facts of the question (see utils.temporal_facts).
+        answer: Generated answer.
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    vector = vector / (np.linalg.norm(vector) or 1.0)
+
+    with _lock:
+        cache = _caches.get(user_name)
+        if cache is None or cache["version"] < version:
+            cache = _caches[user_name] = _new_cache(version, len(vector))
+        elif cache["version"] > version:
+            # The graph changed while the answer was being computed
+            return
+
+        cache["embeddings"] = np.vstack([cache["embeddings"], vector])[-MAX_ENTRIES_PER_USER:]
+        cache["temporal"] = (cache["temporal"] + [list(temporal)])[-MAX_ENTRIES_PER_USER:]
+        cache["answers"] = (cache["answers"] + [answer])[-MAX_ENTRIES_PER_USER:]
+
+
+def get_metrics() -> dict:
+    """
+    Hit, miss and invalidation counters of the answer cache since the start of the process.
+
+    Returns:
+        Dictionary with the counters, the hit rate and the number of cached answers.
+    """
+    with _lock:
+        metrics = dict(_metrics)
+        metrics["entries"] = sum(len(cache["answers"]) for cache in _caches.values())
+    lookups = metrics["hits"] + metrics["misses"]
+    metrics["hit_rate"] = metrics["hits"] / lookups if lookups else 0.0
+    return metrics
+
+
+def clear():
+    """
+    Drop every cached answer and reset the metrics.
+    """
+    with _lock:
+        _caches.clear()
+        for name in _metrics:
+            _metrics[name] = 0
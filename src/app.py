@@ -4,12 +4,40 @@ from datetime import datetime
 
 import KG_construction
 import GraphRAG
+import retention
 import utils
 
+
+@st.cache_resource
+def load_backends():
+    """
+    Create the Neo4j driver and the models once per Streamlit server process,
+    so that reruns triggered by widget interactions do not rebuild them.
+    """
+    utils.get_driver()
+    utils.get_llm_el()
+    KG_construction.get_llm()
+    KG_construction.get_embedding_model()
+    KG_construction.get_schema()
+    GraphRAG.get_embedder_model()
+    GraphRAG.get_llm_model()
+
+
+load_backends()
+
 # Get current date in yyyy/mm/dd format
 current_date = datetime.today().strftime("%Y/%m/%d")
 user_name = "Mateo"
 
+
+@st.cache_resource
+def run_retention(day: str) -> int:
+    """
+    Move chunks older than the retention horizon to the cold tier, at most once per day.
+    """
+    return retention.archive_chunks(reference_date=day)
+
+
 # =========================
 # STYLING
 # =========================
@@ -86,16 +114,35 @@ tab_insert, tab_query = st.tabs(["📝 Add Information", "🔍 Ask Information"]
 with tab_insert:
     user_input = st.text_area("Input", label_visibility="collapsed", placeholder="Write your task here...", height=100)
     
-    if st.button("📌 Save this"):
-        # Normalize temporal references and personalize pronouns
-        user_input = utils.process_text(text=user_input, current_date=current_date, user_name=user_name)
-        
-        # Add to KG 
-        response = asyncio.run(KG_construction.add_user_input_to_kg(user_input))
-        st.success(response)
+    save = st.button("📌 Save this")
 
-        # Entity resolution to avoid duplicates
-        resolved = asyncio.run(KG_construction.resolve_kg_entities())
+    # A near-duplicate of something saved today is only inserted once the user confirms it
+    force = False
+    if not save and st.session_state.get("pending_entry") == user_input:
+        st.warning("This looks very similar to something you already saved today. Save it anyway?")
+        force = st.button("✅ Save anyway")
+
+    if save or force:
+        st.session_state.pop("pending_entry", None)
+
+        # Normalize temporal references, personalize pronouns and add to KG, unless already saved
+        try:
+            response = asyncio.run(KG_construction.ingest_entry(user_input, user_name=user_name,
+                                                                reference_date=current_date, force=force))
+        except KG_construction.NearDuplicateEntry:
+            st.session_state["pending_entry"] = user_input
+            st.rerun()
+
+        if response is None:
+            st.info("This was already saved.")
+        else:
+            st.success(response)
+
+            # Entity resolution to avoid duplicates
+            resolved = asyncio.run(KG_construction.resolve_kg_entities())
+
+        # Keep the hot indexes small
+        run_retention(current_date)
 
 
 # =========================
@@ -105,11 +152,14 @@ with tab_query:
     question = st.text_area("Query", label_visibility="collapsed", placeholder="Write your question here...", height=100)
     
     if st.button("🔎 Get an Answer"):
+        # Keep the hot indexes small
+        run_retention(current_date)
+
         # Normalize temporal references in the question
         question = utils.process_date(text=question, current_date=current_date)
 
-        # Use GraphRAG to generate answer
-        answer = GraphRAG.answer_graphRAG(question)
+        # Use the timeline for date questions, GraphRAG otherwise
+        answer = GraphRAG.answer_timeline(question, user_name=user_name)
 
         st.markdown(f"""
             <div style='background-color: #ffffff;
@@ -0,0 +1,137 @@
+from datetime import date, timedelta
+
+import utils
+
+# Chunks whose reference date is older than this many days leave the hot indexes
+ARCHIVE_HORIZON_DAYS = 90
+
+# Activity statuses considered completed (compared in lowercase)
+COMPLETED_STATUSES = ["completed", "complete", "done", "finished"]
+
+# Hot chunks to archive. A chunk is aged by the days it is about, not only by the day it was
+# written: chunks older than the horizon are kept while they mention a day after the cutoff,
+# and chunks only about completed activities are kept while they mention a day to come.
+ARCHIVE_CANDIDATES_QUERY = """
+    MATCH (c:Chunk)
+    WHERE (c.referenceDate < date($cutoff)
+           AND NOT EXISTS {
+              MATCH (c)<-[:FROM_CHUNK]-(n)
+              WHERE n.timelineDate >= $cutoff
+           })
+       OR (EXISTS {
+              MATCH (c)<-[:FROM_CHUNK]-(a:Activity)
+              WHERE toLower(a.status) IN $completed
+           }
+           AND NOT EXISTS {
+              MATCH (c)<-[:FROM_CHUNK]-(a:Activity)
+              WHERE a.status IS NULL OR NOT toLower(a.status) IN $completed
+           }
+           AND NOT EXISTS {
+              MATCH (c)<-[:FROM_CHUNK]-(n)
+              WHERE n.timelineDate >= $today
+           })
+    RETURN elementId(c) AS id, c.embedding AS embedding
+    LIMIT $batch
+"""
+
+# Move chunks to the cold tier. The ArchivedChunk label is not covered by the textChuck
+# and textFulltext indexes; entities and relationships are left untouched.
+ARCHIVE_CHUNKS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (c:Chunk) WHERE elementId(c) = row.id
+    REMOVE c:Chunk, c.embedding
+    SET c:ArchivedChunk,
+        c.embeddingArchive = row.embedding,
+        c.archivedAt = datetime()
+"""
+
+# Chunks written before chunks were tagged: reference date from the latest day they are about, else today
+BACKFILL_REFERENCE_DATES_QUERY = """
+    MATCH (c)
+    WHERE (c:Chunk OR c:ArchivedChunk) AND c.referenceDate IS NULL
+    WITH c LIMIT $batch
+    OPTIONAL MATCH (c)<-[:FROM_CHUNK]-(n)
+    WHERE n.timelineDate <> ""
+    WITH c, max(n.timelineDate) AS latest
+    SET c.referenceDate = CASE WHEN latest IS NULL THEN date() ELSE date(latest) END
+    RETURN count(c) AS count
+"""
+
+
+def get_archive_cutoff(reference_date: str = None, horizon_days: int = None) -> date:
+    """
+    First day that is still kept in the hot tier.
+
+    Args:
+        reference_date: Date taken as today, in any format understood by utils.parse_date; today if None.
+        horizon_days: Retention horizon; ARCHIVE_HORIZON_DAYS env variable or default if None.
+
+    Returns:
+        The cutoff date; chunks referring to earlier days are archived.
+    """
+    if horizon_days is None:
+        horizon_days = int(utils.get_env("ARCHIVE_HORIZON_DAYS") or ARCHIVE_HORIZON_DAYS)
+    today = utils.parse_date(reference_date) or date.today()
+    return today - timedelta(days=horizon_days)
+
+
+def archive_chunks(reference_date: str = None, horizon_days: int = None, batch_size: int = 500) -> int:
+    """
+    Move old chunks and chunks of completed activities out of the vector and fulltext indexes.
+    Chunks that mention a day after the cutoff (or, for completed activities, a day to come),
+    such as a project due next year, stay in the hot tier.
+
+    Archived chunks keep their text, their FROM_CHUNK relationships and a compressed copy of
+    their embedding (see utils.compress_embedding), so GraphRAG can still search them on demand.
+
+    Args:
+        reference_date: Date taken as today; today if None.
+        horizon_days: Retention horizon in days.
+        batch_size: Chunks moved per transaction.
+
+    Returns:
+        Number of archived chunks.
+    """
+    today = (utils.parse_date(reference_date) or date.today()).isoformat()
+    cutoff = get_archive_cutoff(reference_date, horizon_days).isoformat()
+    archived = 0
+
+    with utils.get_driver().session() as session:
+        while True:
+            records = list(session.run(ARCHIVE_CANDIDATES_QUERY, cutoff=cutoff, today=today,
+                                       completed=COMPLETED_STATUSES, batch=batch_size))
+            if not records:
+                break
+            rows = [{
+                "id": record["id"],
+                "embedding": utils.compress_embedding(record["embedding"]) if record["embedding"] else None,
+            } for record in records]
+            session.run(ARCHIVE_CHUNKS_QUERY, rows=rows)
+            archived += len(rows)
+
+    if archived:
+        utils.bump_graph_version()
+    return archived
+
+
+def backfill_reference_dates(batch_size: int = 500) -> int:
+    """
+    One-off migration for graphs written before chunks were tagged with a reference date.
+
+    Untagged chunks get the latest day their entities are about, or today if they mention
+    none, so that they start ageing from now instead of staying hot forever.
+
+    Args:
+        batch_size: Chunks updated per transaction.
+
+    Returns:
+        Number of updated chunks.
+    """
+    updated = 0
+    with utils.get_driver().session() as session:
+        while True:
+            count = session.run(BACKFILL_REFERENCE_DATES_QUERY, batch=batch_size).single()["count"]
+            if not count:
+                break
+            updated += count
+    return updated
@@ -1,18 +1,58 @@
+from datetime import date
+from functools import lru_cache
+import hashlib
+import zlib
+import numpy as np
 from langchain.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
 import os
+import re
 
-# Load environment variables from .env file
-load_dotenv()
-URI = os.getenv("NEO4J_URI")
-USERNAME = os.getenv("NEO4J_USERNAME")
-PASSWORD = os.getenv("NEO4J_PASSWORD")
-ONTOLOGY_FILE = os.getenv("ONTOLOGY_FILE")
+import answer_cache
 
-# Initialize the LLM model for prompt-based operations
-llm_el = ChatOpenAI(model="gpt-4o-mini")
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """
+    Load environment variables from the .env file once per process.
+    """
+    load_dotenv()
+
+
+def get_env(name: str) -> str:
+    """
+    Read a configuration value, loading the .env file on first access.
+
+    Args:
+        name: Name of the environment variable.
+
+    Returns:
+        The variable value, or None if it is not set.
+    """
+    load_env()
+    return os.getenv(name)
+
+
+@lru_cache(maxsize=None)
+def get_driver():
+    """
+    Create the Neo4j driver on first use and share it for the lifetime of the process.
+
+    Returns:
+        Neo4j driver connected to the configured database.
+    """
+    return GraphDatabase.driver(get_env("NEO4J_URI"), auth=(get_env("NEO4J_USERNAME"), get_env("NEO4J_PASSWORD")))
+
+
+@lru_cache(maxsize=None)
+def get_llm_el() -> ChatOpenAI:
+    """
+    Initialize the LLM model for prompt-based operations on first use.
+    """
+    load_env()
+    return ChatOpenAI(model="gpt-4o-mini")
 
 
 def process_text(text: str, user_name: str, current_date: str) -> str:
@@ -42,7 +82,7 @@ def process_text(text: str, user_name: str, current_date: str) -> str:
     """
     prompt = PromptTemplate(input_variables=["user_name", "text", "current_date"], template=template)
     formatted_prompt = prompt.format(user_name=user_name, text=text, current_date=current_date)
-    response = llm_el.invoke(formatted_prompt)
+    response = get_llm_el().invoke(formatted_prompt)
     return response.content
 
 
@@ -70,17 +110,22 @@ def process_date(text: str, current_date: str) -> str:
     """
     prompt = PromptTemplate(input_variables=["current_date", "text"], template=template)
     formatted_prompt = prompt.format(current_date=current_date, text=text)
-    response = llm_el.predict(formatted_prompt)
+    response = get_llm_el().predict(formatted_prompt)
     return response.strip()
 
 
 def add_indexes():
     """
-    Create vector and fulltext indexes on the Neo4j database if they do not already exist.
-    These indexes are used for semantic search and similarity-based retrieval.
+    Create the indexes and constraints of the Neo4j database if they do not already exist:
+        - textChuck, textFulltext: semantic and keyword search over chunks.
+        - dayUserDate: timeline lookups by user and day.
+        - dayDateRange: archive lookups by date range.
+        - chunkIngestion, entityIngestion: nodes written by one insertion.
+        - diaryEntryKey, diaryEntryUserDate: ingestion ledger.
+        - graphVersionName: version node of the answer cache.
+        - chunkReferenceDate, archivedChunkReferenceDate: retention and archive lookups.
     """
-    driver = GraphDatabase.driver(URI, auth=(USERNAME, PASSWORD))
-    with driver.session() as session:
+    with get_driver().session() as session:
         session.run("""
             CREATE VECTOR INDEX textChuck IF NOT EXISTS
             FOR (c:Chunk)
@@ -95,18 +140,100 @@ def add_indexes():
             FOR (c:Chunk)
             ON EACH [c.text]
         """)
-    driver.close()
+        session.run("""
+            CREATE CONSTRAINT dayUserDate IF NOT EXISTS
+            FOR (d:Day)
+            REQUIRE (d.user, d.date) IS UNIQUE
+        """)
+        session.run("""
+            CREATE INDEX dayDateRange IF NOT EXISTS
+            FOR (d:Day)
+            ON (d.date)
+        """)
+        session.run("""
+            CREATE INDEX chunkIngestion IF NOT EXISTS
+            FOR (c:Chunk)
+            ON (c.ingestionId)
+        """)
+        session.run("""
+            CREATE INDEX entityIngestion IF NOT EXISTS
+            FOR (n:__Entity__)
+            ON (n.ingestionId)
+        """)
+        session.run("""
+            CREATE CONSTRAINT diaryEntryKey IF NOT EXISTS
+            FOR (e:DiaryEntry)
+            REQUIRE e.key IS UNIQUE
+        """)
+        session.run("""
+            CREATE INDEX diaryEntryUserDate IF NOT EXISTS
+            FOR (e:DiaryEntry)
+            ON (e.user, e.date)
+        """)
+        session.run("""
+            CREATE CONSTRAINT graphVersionName IF NOT EXISTS
+            FOR (v:GraphVersion)
+            REQUIRE v.name IS UNIQUE
+        """)
+        session.run("""
+            CREATE INDEX chunkReferenceDate IF NOT EXISTS
+            FOR (c:Chunk)
+            ON (c.referenceDate)
+        """)
+        session.run("""
+            CREATE INDEX archivedChunkReferenceDate IF NOT EXISTS
+            FOR (c:ArchivedChunk)
+            ON (c.referenceDate)
+        """)
+
+
+GRAPH_VERSION_QUERY = """
+    MATCH (v:GraphVersion {name: "graph"})
+    RETURN v.version AS version
+"""
+
+
+def get_graph_version() -> int:
+    """
+    Read the version of the graph, increased by bump_graph_version on every write.
+
+    Retrieval is not scoped by user, so a write by any user changes the version and
+    invalidates the cached answers of every user (see answer_cache).
+
+    Returns:
+        The current version, 0 if the graph was never written.
+    """
+    with get_driver().session() as session:
+        records = list(session.run(GRAPH_VERSION_QUERY))
+    return records[0]["version"] if records else 0
+
+
+# Invalidate cached answers. The version follows the clock, so it never repeats after a reset.
+BUMP_GRAPH_VERSION_QUERY = """
+    MERGE (v:GraphVersion {name: "graph"})
+    SET v.version = CASE WHEN timestamp() > coalesce(v.version, 0) THEN timestamp() ELSE v.version + 1 END
+"""
+
+
+def bump_graph_version():
+    """
+    Increase the graph version, so that answers cached before this write are no longer served.
+    Retrieval reads the chunks of every user, so any write invalidates the answers of all users;
+    the answer cache therefore only helps read-heavy, single-user deployments.
+    """
+    with get_driver().session() as session:
+        session.run(BUMP_GRAPH_VERSION_QUERY)
 
 
 def reset_knowledge_graph():
     """
     Remove all nodes and relationships from the Neo4j graph database.
     Useful for development and testing environments.
+    The answers cached in this process are dropped as well.
     """
-    driver = GraphDatabase.driver(URI, auth=(USERNAME, PASSWORD))
-    with driver.session() as session:
+    with get_driver().session() as session:
         session.run("MATCH (n) DETACH DELETE n")
-    driver.close()
+    answer_cache.clear()
 
 
 def extract_unique_chunks(text: str) -> list:
@@ -131,3 +258,208 @@ def extract_unique_chunks(text: str) -> list:
 
     return remove_duplicates(all_lines)
 
+
+
+MONTHS = {
+    name: number for number, name in enumerate(
+        ["january", "february", "march", "april", "may", "june", "july",
+         "august", "september", "october", "november", "december"], start=1)
+}
+MONTH_PATTERN = "|".join(MONTHS)
+DATE_PATTERNS = [
+    # 2023-10-24, 2023/10/24
+    (re.compile(r"\b(\d{4})[-/](\d{1,2})[-/](\d{1,2})\b"), ("year", "month", "day")),
+    # October 24, 2023 / October 24th 2023
+    (re.compile(rf"\b({MONTH_PATTERN})\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b", re.IGNORECASE), ("month", "day", "year")),
+    # 24 October 2023
+    (re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({MONTH_PATTERN}),?\s+(\d{{4}})\b", re.IGNORECASE), ("day", "month", "year")),
+]
+
+
+def extract_dates(text: str) -> list:
+    """
+    Find the calendar dates mentioned in a text, in order of appearance.
+
+    Args:
+        text: Text whose temporal references have already been normalized (see process_text and process_date).
+
+    Returns:
+        List of datetime.date objects, without duplicates.
+    """
+    found = []
+    for pattern, fields in DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            parts = dict(zip(fields, match.groups()))
+            month = parts["month"]
+            month = MONTHS[month.lower()] if not month.isdigit() else int(month)
+            try:
+                found.append((match.start(), date(int(parts["year"]), month, int(parts["day"]))))
+            except ValueError:
+                continue
+    dates = []
+    for _, value in sorted(found, key=lambda item: item[0]):
+        if value not in dates:
+            dates.append(value)
+    return dates
+
+
+def parse_date(value) -> date:
+    """
+    Convert a date or datetime property written by the extractor into a calendar date.
+
+    Args:
+        value: Neo4j temporal value or string such as "2023-10-10", "2023-10-10T15:00:00" or "October 10, 2023".
+
+    Returns:
+        The corresponding datetime.date, or None if the value cannot be interpreted.
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        dates = extract_dates(text)
+        return dates[0] if dates else None
+
+
+# Clock times: "15:00", "3:30 pm", "3 PM", "3 p.m."
+TIME_PATTERN = re.compile(r"\b(\d{1,2}):(\d{2})(?:\s*([ap])\.?m\b\.?)?|\b(\d{1,2})\s*([ap])\.?m\b\.?", re.IGNORECASE)
+RELATIVE_DAY_PATTERN = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|weekend|next week|last week|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", re.IGNORECASE)
+
+
+def extract_times(text: str) -> list:
+    """
+    Find the clock times mentioned in a text.
+
+    Args:
+        text: Any text, e.g. a raw diary entry.
+
+    Returns:
+        List of "HH:MM" strings in 24-hour format, without duplicates.
+    """
+    times = []
+    for match in TIME_PATTERN.finditer(text):
+        hour, minute, meridiem = (match.group(1), match.group(2), match.group(3)) if match.group(1) \
+            else (match.group(4), "00", match.group(5))
+        hour, minute = int(hour), int(minute)
+        if meridiem:
+            hour = hour % 12 + (12 if meridiem.lower() == "p" else 0)
+        if hour > 23 or minute > 59:
+            continue
+        value = f"{hour:02d}:{minute:02d}"
+        if value not in times:
+            times.append(value)
+    return times
+
+
+def temporal_facts(text: str) -> list:
+    """
+    Dates, clock times and relative day references of a text, used to tell a reworded
+    entry apart from a correction (e.g. a rescheduled appointment).
+
+    Args:
+        text: Any text, e.g. a raw diary entry.
+
+    Returns:
+        Sorted list of ISO dates, "HH:MM" times and lowercase relative references.
+    """
+    facts = {day.isoformat() for day in extract_dates(text)}
+    facts.update(extract_times(text))
+    facts.update(match.group(1).lower() for match in RELATIVE_DAY_PATTERN.finditer(text))
+    return sorted(facts)
+
+
+# MinHash parameters for near-duplicate detection of diary entries
+MINHASH_PERMUTATIONS = 64
+MINHASH_SHINGLE_SIZE = 5
+MERSENNE_PRIME = (1 << 31) - 1
+_minhash_rng = np.random.default_rng(2025)
+MINHASH_A = _minhash_rng.integers(1, MERSENNE_PRIME, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+MINHASH_B = _minhash_rng.integers(0, MERSENNE_PRIME, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def normalize_entry(text: str) -> str:
+    """
+    Lowercase a text and collapse its whitespace, so that trivially different submissions compare equal.
+    """
+    return " ".join(text.lower().split())
+
+
+def entry_key(text: str, user_name: str, reference_date: str) -> str:
+    """
+    Identity of a diary entry: content hash of the normalized text, scoped to user and reference date.
+
+    Args:
+        text: Raw user input.
+        user_name: The user's name.
+        reference_date: Date the entry refers to.
+
+    Returns:
+        Hexadecimal SHA-256 digest.
+    """
+    identity = f"{user_name}|{reference_date}|{normalize_entry(text)}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+def minhash_signature(text: str) -> list:
+    """
+    Compute a MinHash signature over the character shingles of the normalized text.
+
+    Args:
+        text: Raw user input.
+
+    Returns:
+        List of MINHASH_PERMUTATIONS integers.
+    """
+    normalized = normalize_entry(text)
+    shingles = {normalized[i:i + MINHASH_SHINGLE_SIZE]
+                for i in range(max(len(normalized) - MINHASH_SHINGLE_SIZE + 1, 1))}
+    hashes = np.array([zlib.crc32(s.encode("utf-8")) % MERSENNE_PRIME for s in shingles], dtype=np.uint64)
+    permuted = (MINHASH_A[:, None] * hashes[None, :] + MINHASH_B[:, None]) % MERSENNE_PRIME
+    return permuted.min(axis=1).tolist()
+
+
+def max_minhash_similarity(signature: list, others: list) -> float:
+    """
+    Estimate the highest Jaccard similarity between a signature and a set of signatures.
+
+    Args:
+        signature: MinHash signature of the new entry.
+        others: Signatures of previous entries.
+
+    Returns:
+        Similarity in [0, 1], 0 if there are no other signatures.
+    """
+    if not others:
+        return 0.0
+    matches = np.asarray(others, dtype=np.int64) == np.asarray(signature, dtype=np.int64)
+    return float(matches.mean(axis=1).max())
+
+
+def compress_embedding(embedding: list) -> bytes:
+    """
+    Pack an embedding for the cold tier: half precision, then zlib.
+
+    Args:
+        embedding: Embedding vector.
+
+    Returns:
+        Compressed bytes, about a quarter of the size of the original list of floats.
+    """
+    return zlib.compress(np.asarray(embedding, dtype=np.float16).tobytes())
+
+
+def decompress_embedding(data: bytes) -> np.ndarray:
+    """
+    Unpack an embedding packed by compress_embedding.
+
+    Args:
+        data: Compressed bytes.
+
+    Returns:
+        Embedding as a float32 array.
+    """
+    return np.frombuffer(zlib.decompress(bytes(data)), dtype=np.float16).astype(np.float32)
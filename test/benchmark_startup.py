@@ -0,0 +1,124 @@
+"""
+Startup-time benchmark for the Streamlit app and the modules it imports.
+
+For every source directory given, the benchmark measures in fresh interpreters:
+    - the cold import time of each application module;
+    - the cold start of the Streamlit script (first run, models included);
+    - the overhead of each following rerun of the script (what a user pays on every widget interaction).
+
+To compare before and after a change, check out the older version next to the current one:
+
+    git worktree add /tmp/tam-baseline <commit>
+    python test/benchmark_startup.py --src src /tmp/tam-baseline/src
+
+No network access is needed: clients are only constructed, never called. A placeholder
+OpenAI key is used when none is configured.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+MODULES = ["utils", "KG_construction", "GraphRAG", "RAGAS_test"]
+
+IMPORT_SNIPPET = textwrap.dedent("""
+    import json, sys, time
+    sys.path.insert(0, {src!r})
+    start = time.perf_counter()
+    import {module}
+    print(json.dumps(time.perf_counter() - start))
+""")
+
+APP_SNIPPET = textwrap.dedent("""
+    import json, os, sys, time
+    sys.path.insert(0, {src!r})
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join({src!r}, "app.py"), default_timeout=120)
+    start = time.perf_counter()
+    app.run()
+    cold = time.perf_counter() - start
+
+    reruns = []
+    for _ in range({reruns}):
+        start = time.perf_counter()
+        app.run()
+        reruns.append(time.perf_counter() - start)
+    print(json.dumps({{"cold": cold, "reruns": reruns}}))
+""")
+
+
+def run_snippet(code: str, cwd: str):
+    """
+    Run a snippet in a new interpreter and return the JSON value it prints last.
+    """
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+    env.setdefault("NEO4J_URI", "neo4j://localhost:7687")
+    env.setdefault("ONTOLOGY_FILE", os.path.join(cwd, "models", "TAMOntology.ttl"))
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "benchmark failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median(values: list) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def benchmark_source(src: str, repeat: int, reruns: int) -> dict:
+    """
+    Collect import, cold-start and rerun timings for one source directory.
+
+    Args:
+        src: Directory containing app.py and the application modules.
+        repeat: Number of fresh interpreters used for each measurement.
+        reruns: Number of reruns of the Streamlit script per interpreter.
+
+    Returns:
+        Dictionary with median timings in seconds.
+    """
+    src = os.path.abspath(src)
+    cwd = os.path.dirname(src)
+    report = {"imports": {}}
+
+    for module in MODULES:
+        try:
+            timings = [run_snippet(IMPORT_SNIPPET.format(src=src, module=module), cwd) for _ in range(repeat)]
+            report["imports"][module] = median(timings)
+        except RuntimeError as error:
+            report["imports"][module] = f"error: {error}"
+
+    cold, rerun = [], []
+    for _ in range(repeat):
+        timings = run_snippet(APP_SNIPPET.format(src=src, reruns=reruns), cwd)
+        cold.append(timings["cold"])
+        rerun.extend(timings["reruns"])
+    report["app_cold_start"] = median(cold)
+    report["app_rerun"] = median(rerun)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--src", nargs="+", default=["src"], help="Source directories to compare")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per measurement")
+    parser.add_argument("--reruns", type=int, default=10, help="Script reruns per interpreter")
+    args = parser.parse_args()
+
+    for src in args.src:
+        report = benchmark_source(src, args.repeat, args.reruns)
+        print(f"\n=== {src} ===")
+        for module, value in report["imports"].items():
+            print(f"import {module:<16} {value if isinstance(value, str) else f'{value * 1000:8.1f} ms'}")
+        print(f"app cold start         {report['app_cold_start'] * 1000:8.1f} ms")
+        print(f"app rerun (median)     {report['app_rerun'] * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
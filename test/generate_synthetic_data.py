@@ -0,0 +1,204 @@
+"""
+Synthetic data generator for scale and load tests.
+
+Grows the bundled profiles into many users and long diaries, using the users listed in
+data/cases.csv as seeds. Every synthetic user replays the interactions of a seed profile
+in consecutive cycles; each cycle moves all dates (reference dates and dates mentioned in
+the text) forward by the length of the seed diary, so the generated diary stays coherent.
+
+The output mirrors data/profiles and data/qa:
+
+    <out>/profiles/<user>.csv      date,user,interaction
+    <out>/qa/<user>_qa.json        [{"question": ..., "answer": ...}]
+
+Example (100k interactions across 500 users):
+
+    python test/generate_synthetic_data.py --interactions 100000 --users 500 --out test/data/synthetic
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import re
+from datetime import date, timedelta
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+NAMED_DATE = re.compile(rf"\b({'|'.join(MONTHS)}) (\d{{1,2}})(,? )(\d{{4}})\b")
+
+
+def shift_dates(text: str, days: int) -> str:
+    """
+    Move every absolute date mentioned in a text by a number of days, keeping its format.
+    """
+    if days == 0:
+        return text
+
+    def shift_iso(match):
+        try:
+            shifted = date(*map(int, match.groups())) + timedelta(days=days)
+        except ValueError:
+            return match.group(0)
+        return shifted.isoformat()
+
+    def shift_named(match):
+        month, day, separator, year = match.groups()
+        try:
+            shifted = date(int(year), MONTHS.index(month) + 1, int(day)) + timedelta(days=days)
+        except ValueError:
+            return match.group(0)
+        return f"{MONTHS[shifted.month - 1]} {shifted.day}{separator}{shifted.year}"
+
+    return NAMED_DATE.sub(shift_named, ISO_DATE.sub(shift_iso, text))
+
+
+def mentioned_dates(text: str) -> list:
+    """
+    Absolute dates mentioned in a text, in the formats handled by shift_dates.
+    """
+    dates = []
+    for match in ISO_DATE.finditer(text):
+        try:
+            dates.append(date(*map(int, match.groups())))
+        except ValueError:
+            continue
+    for match in NAMED_DATE.finditer(text):
+        month, day, _, year = match.groups()
+        try:
+            dates.append(date(int(year), MONTHS.index(month) + 1, int(day)))
+        except ValueError:
+            continue
+    return dates
+
+
+def load_seeds(data_dir: str) -> list:
+    """
+    Load the seed profiles: users of cases.csv that have an interaction profile.
+
+    Returns:
+        List of dictionaries with the seed name, its interactions and its QA pairs.
+    """
+    with open(os.path.join(data_dir, "cases.csv"), newline="", encoding="utf-8") as file:
+        names = [row[0].strip() for row in list(csv.reader(file))[1:] if row]
+
+    seeds = []
+    for name in names:
+        profile_path = os.path.join(data_dir, "profiles", f"{name}.csv")
+        if not os.path.exists(profile_path):
+            continue
+        with open(profile_path, newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+
+        qa_path = os.path.join(data_dir, "qa", f"{name}_qa.json")
+        qa = []
+        if os.path.exists(qa_path):
+            with open(qa_path, encoding="utf-8") as file:
+                qa = json.load(file)
+
+        dates = [date.fromisoformat(row["date"]) for row in rows]
+        seeds.append({
+            "name": name,
+            "rows": rows,
+            "qa": qa,
+            "span": (max(dates) - min(dates)).days + 1,
+        })
+    return seeds
+
+
+def generate_user(seed: dict, user_name: str, interactions: int, offset: int, qa_per_user: int):
+    """
+    Build the diary and the QA pairs of one synthetic user.
+
+    Args:
+        seed: Seed profile as returned by load_seeds.
+        user_name: Name of the synthetic user, replacing the seed name in the texts.
+        interactions: Number of interactions to generate.
+        offset: Days added to every date, so that users do not all start on the same day.
+        qa_per_user: Maximum number of QA pairs.
+
+    Returns:
+        Tuple (rows, qa) ready to be written.
+    """
+    rename = re.compile(rf"\b{re.escape(seed['name'])}\b")
+    seed_rows = seed["rows"]
+
+    rows = []
+    entries_by_day = {}
+    last_day = {}
+    for index in range(interactions):
+        cycle, position = divmod(index, len(seed_rows))
+        shift = offset + cycle * seed["span"]
+        row = seed_rows[position]
+        day = date.fromisoformat(row["date"]) + timedelta(days=shift)
+        text = rename.sub(user_name, shift_dates(row["interaction"], shift))
+        rows.append({"date": day.isoformat(), "user": user_name, "interaction": text})
+        entries_by_day.setdefault(day.isoformat(), []).append(text)
+        last_day[cycle] = max(last_day.get(cycle, day), day)
+
+    cycles = (interactions + len(seed_rows) - 1) // len(seed_rows)
+    partial = interactions % len(seed_rows) != 0
+    qa = []
+    for cycle in range(cycles):
+        shift = offset + cycle * seed["span"]
+        for pair in seed["qa"]:
+            question = shift_dates(pair["question"], shift)
+            dates = mentioned_dates(question)
+            # Undated questions have one answer per cycle once the diary repeats: keep only dated ones
+            if cycles > 1 and not dates:
+                continue
+            # The last cycle stops before the end of the seed diary: skip days that were not written
+            if cycle == cycles - 1 and partial and any(day > last_day[cycle] for day in dates):
+                continue
+            qa.append({"question": question, "answer": rename.sub(user_name, shift_dates(pair["answer"], shift))})
+
+    # Day questions answered by the diary of that day
+    for day, texts in entries_by_day.items():
+        qa.append({"question": f"What did I write about on {day}?", "answer": " ".join(texts)})
+
+    return rows, qa[:qa_per_user]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interactions", type=int, default=10000, help="Total interactions across all users")
+    parser.add_argument("--users", type=int, default=100, help="Number of synthetic users")
+    parser.add_argument("--qa-per-user", type=int, default=50, help="Maximum QA pairs per user")
+    parser.add_argument("--out", default=os.path.join(DATA_DIR, "synthetic"), help="Output directory")
+    parser.add_argument("--data", default=DATA_DIR, help="Directory with cases.csv, profiles/ and qa/")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    seeds = load_seeds(args.data)
+    if not seeds:
+        raise SystemExit(f"No seed profiles found in {args.data}")
+
+    rng = random.Random(args.seed)
+    os.makedirs(os.path.join(args.out, "profiles"), exist_ok=True)
+    os.makedirs(os.path.join(args.out, "qa"), exist_ok=True)
+
+    per_user, remainder = divmod(args.interactions, args.users)
+    for index in range(args.users):
+        seed = seeds[index % len(seeds)]
+        user_name = f"{seed['name']}_{index // len(seeds) + 1}"
+        count = per_user + (1 if index < remainder else 0)
+        if count == 0:
+            continue
+        rows, qa = generate_user(seed, user_name, count, rng.randrange(365), args.qa_per_user)
+
+        with open(os.path.join(args.out, "profiles", f"{user_name}.csv"), "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=["date", "user", "interaction"])
+            writer.writeheader()
+            writer.writerows(rows)
+        with open(os.path.join(args.out, "qa", f"{user_name}_qa.json"), "w", encoding="utf-8") as file:
+            json.dump(qa, file, indent=2, ensure_ascii=False)
+
+    print(f"Generated {args.interactions} interactions for {args.users} users in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+"""
+Concurrent-user load test for the diary service.
+
+Fires concurrent insert and question traffic at the application entry points
+(KG_construction.ingest_entry and GraphRAG.answer_timeline) and reports throughput,
+tail latency, answer cache metrics and how the size of the graph affects retrieval time.
+
+No external service is used:
+    - the LLMs and the embedder are replaced by deterministic fakes with a configurable latency;
+    - the Neo4j driver is replaced by LocalGraph, an in-memory stand-in that answers the
+      Cypher queries issued by the application modules (ledger, timeline, day summaries);
+    - the neo4j-graphrag stages (extraction pipeline and hybrid retrieval) are replaced by
+      equivalent local work: dated entities are extracted with utils.extract_dates and the
+      hybrid search is a brute-force cosine search over the chunk embeddings;
+    - nothing is archived, so the cold-tier lookups of GraphRAG find no chunks.
+
+Everything else (deduplication ledger, timeline maintenance, graph versions, answer cache,
+question routing) is the real code.
+The python dependencies in requirements.txt must be installed.
+
+Example:
+
+    python test/generate_synthetic_data.py --interactions 100000 --users 500
+    python test/run_load_test.py --data test/data/synthetic --preload 50000 --operations 5000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import bisect
+import csv
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import GraphRAG
+import KG_construction
+import answer_cache
+import utils
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class LocalGraph:
+    """
+    In-memory stand-in for the Neo4j database.
+
+    It answers, by identity of the query string, the Cypher queries defined in the
+    application modules, and stores the chunks written by the fake extraction pipeline.
+    """
+
+    def __init__(self, dimensions: int):
+        self.lock = threading.RLock()
+        self.dimensions = dimensions
+        self.entries = {}
+        self.entities = {}
+        self.days = {}
+        self.day_index = {}
+        self.chunk_texts = []
+        self.chunk_entities = []
+        self.embeddings = np.zeros((1024, dimensions), dtype=np.float32)
+        self.retrieval_samples = {"hybrid": [], "timeline": []}
+        self.handlers = {
+            KG_construction.ENTRY_LEDGER_QUERY: self.read_ledger,
+            KG_construction.RECORD_ENTRY_QUERY: self.record_entry,
+            KG_construction.TIMELINE_CANDIDATES_QUERY: self.timeline_candidates,
+            KG_construction.TIMELINE_LINK_QUERY: self.link_timeline,
+            KG_construction.DAY_SUMMARY_QUERY: self.summarize_days,
+            GraphRAG.TIMELINE_CYPHER_QUERY: self.read_timeline,
+            utils.GRAPH_VERSION_QUERY: self.read_version,
+            utils.BUMP_GRAPH_VERSION_QUERY: self.bump_version,
+            GraphRAG.ARCHIVE_BY_DATE_QUERY: self.read_archive,
+            GraphRAG.ARCHIVE_RECENT_QUERY: self.read_archive,
+        }
+        self.version = 0
+
+    # Driver and session interface used by the application modules
+    def session(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query: str, **params):
+        handler = self.handlers.get(query)
+        if handler is None:
+            raise ValueError(f"Query not supported by the local graph: {query.strip()[:60]}...")
+        with self.lock:
+            return handler(**params)
+
+    # Query handlers
+    def read_ledger(self, user, date):
+        return [dict(entry) for entry in self.entries.get((user, date), [])]
+
+    def record_entry(self, key, user, date, signature, temporal):
+        ledger = self.entries.setdefault((user, date), [])
+        if all(entry["key"] != key for entry in ledger):
+            ledger.append({"key": key, "signature": signature, "temporal": temporal})
+
+    def timeline_candidates(self, ingestion):
+        records = []
+        for entity_id, entity in self.entities.items():
+            if entity["ingestionId"] != ingestion:
+                continue
+            records.append({
+                "id": entity_id,
+                "isProject": entity["label"] == "Project",
+                "onDate": entity.get("onDate"),
+                "atTime": entity.get("atTime"),
+                "dueDate": entity.get("dueDate"),
+            })
+        return records
+
+    def link_timeline(self, links, user):
+        days = self.days.setdefault(user, {})
+        day_index = self.day_index.setdefault(user, [])
+        for link in links:
+            self.entities[link["id"]]["timelineDate"] = link["date"]
+            if link["date"]:
+                if link["date"] not in days:
+                    bisect.insort(day_index, link["date"])
+                    days[link["date"]] = {"items": [], "summary": ""}
+                days[link["date"]]["items"].append(link["id"])
+
+    def summarize_days(self, dates, user):
+        days = self.days[user]
+        for day in dates:
+            items = days[day]["items"]
+            days[day]["summary"] = " -&- ".join(
+                ("Deadline of project " if self.entities[i]["label"] == "Project" else "Activity: ")
+                + self.entities[i]["name"] for i in items
+            )
+
+    def read_timeline(self, user, start, end):
+        days = self.days.get(user, {})
+        day_index = self.day_index.get(user, [])
+        low = bisect.bisect_left(day_index, start)
+        high = bisect.bisect_right(day_index, end)
+        return [{"date": day, "summary": days[day]["summary"]} for day in day_index[low:high]]
+
+    def read_version(self):
+        return [{"version": self.version}] if self.version else []
+
+    def bump_version(self):
+        self.version += 1
+
+    def read_archive(self, **params):
+        return []
+
+    # Storage used by the fake pipeline and retriever
+    def add_chunk(self, text: str, embedding: np.ndarray, entities: list, ingestion_id: str):
+        with self.lock:
+            count = len(self.chunk_texts)
+            if count == len(self.embeddings):
+                self.embeddings = np.concatenate([self.embeddings, np.zeros_like(self.embeddings)])
+            self.embeddings[count] = embedding
+            self.chunk_texts.append(text)
+
+            ids = []
+            for entity in entities:
+                entity_id = str(len(self.entities))
+                self.entities[entity_id] = dict(entity, ingestionId=ingestion_id)
+                ids.append(entity_id)
+            self.chunk_entities.append(ids)
+
+    def search(self, embedding: np.ndarray, top_k: int) -> list:
+        with self.lock:
+            count = len(self.chunk_texts)
+            matrix = self.embeddings[:count]
+        if count == 0:
+            return []
+        scores = matrix @ embedding
+        top = np.argpartition(-scores, min(top_k, count) - 1)[:top_k]
+        return [int(index) for index in top[np.argsort(-scores[top])]]
+
+    def size(self) -> int:
+        return len(self.chunk_texts)
+
+
+class FakeBackends:
+    """
+    Deterministic replacements for the OpenAI models, with simulated latency.
+    """
+
+    def __init__(self, graph: LocalGraph, llm_latency: float, embedding_latency: float):
+        self.graph = graph
+        self.llm_latency = llm_latency
+        self.embedding_latency = embedding_latency
+
+    def embed(self, text: str) -> np.ndarray:
+        time.sleep(self.embedding_latency)
+        rng = np.random.default_rng(zlib.crc32(utils.normalize_entry(text).encode("utf-8")))
+        vector = rng.standard_normal(self.graph.dimensions).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def rewrite(self, prompt: str) -> str:
+        # process_text and process_date: return the sentence unchanged
+        time.sleep(self.llm_latency)
+        return prompt.split('Here is the sentence to process:')[-1].split('Provide only')[0].strip().strip('"')
+
+    def chat_llm(self):
+        return SimpleNamespace(
+            invoke=lambda prompt: SimpleNamespace(content=self.rewrite(prompt)),
+            predict=self.rewrite,
+        )
+
+    def answer_llm(self):
+        def invoke(prompt, system_instruction=None):
+            time.sleep(self.llm_latency)
+            return SimpleNamespace(content=f"Answer generated from {len(prompt)} characters of prompt.")
+        return SimpleNamespace(invoke=invoke)
+
+    async def add_user_input_to_kg(self, user_input: str, user_name: str = None, reference_date: str = None):
+        # Extraction and embedding of the chunk, as done by the neo4j-graphrag pipeline
+        await asyncio.sleep(self.llm_latency)
+        embedding = self.embed(user_input)
+        is_project = "project" in user_input.lower()
+        entities = [
+            {"label": "Project" if is_project else "Activity", "name": user_input[:60],
+             "dueDate" if is_project else "onDate": day.isoformat()}
+            for day in utils.extract_dates(user_input)
+        ]
+        ingestion_id = uuid.uuid4().hex
+        self.graph.add_chunk(user_input, embedding, entities, ingestion_id)
+        if user_name is not None:
+            KG_construction.update_timeline(ingestion_id, user_name)
+        utils.bump_graph_version()
+        return {"status": "SUCCESS", "metadata": {"node_count": len(entities) + 1}}
+
+    def embedder(self):
+        return SimpleNamespace(embed_query=self.embed)
+
+    def retriever(self):
+        # Hybrid search with 1-hop expansion, formatted like CONTEXT_CYPHER_QUERY
+        def search(query_text, query_vector, top_k):
+            start = time.perf_counter()
+            size = self.graph.size()
+            hits = self.graph.search(np.asarray(query_vector), top_k)
+            with self.graph.lock:
+                chunks = [self.graph.chunk_texts[i] for i in hits]
+                entities = [self.graph.entities[e]["name"] for i in hits for e in self.graph.chunk_entities[i]]
+            self.graph.retrieval_samples["hybrid"].append((size, time.perf_counter() - start))
+            content = " -&- ".join(chunks) + " -&&- " + " -&- ".join(entities) + " -&&- "
+            return SimpleNamespace(items=[SimpleNamespace(content=content)])
+        return SimpleNamespace(search=search)
+
+
+def install_fakes(graph: LocalGraph, backends: FakeBackends):
+    """
+    Point the application modules to the local graph and the fake models.
+    """
+    utils.get_driver = lambda: graph
+    utils.get_llm_el = backends.chat_llm
+    GraphRAG.get_llm_model = backends.answer_llm
+    GraphRAG.get_embedder_model = backends.embedder
+    GraphRAG.get_graphRAG_retriever = backends.retriever
+    KG_construction.add_user_input_to_kg = backends.add_user_input_to_kg
+
+    get_timeline_context = GraphRAG.get_timeline_context
+
+    def timed_timeline_context(question, user_name):
+        start = time.perf_counter()
+        size = graph.size()
+        context = get_timeline_context(question, user_name)
+        graph.retrieval_samples["timeline"].append((size, time.perf_counter() - start))
+        return context
+
+    GraphRAG.get_timeline_context = timed_timeline_context
+
+
+def load_workload(data_dir: str) -> dict:
+    """
+    Read the profiles and QA pairs of every user in a data directory.
+
+    Returns:
+        Dictionary user -> {"name": str, "rows": [...], "questions": [...], "cursor": int}.
+    """
+    users = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, "profiles", "*.csv"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        qa_path = os.path.join(data_dir, "qa", f"{name}_qa.json")
+        questions = []
+        if os.path.exists(qa_path):
+            with open(qa_path, encoding="utf-8") as file:
+                questions = [pair["question"] for pair in json.load(file)]
+        users[name] = {"name": name, "rows": rows, "questions": questions, "cursor": 0, "lock": threading.Lock()}
+    return users
+
+
+def next_row(user: dict):
+    with user["lock"]:
+        if user["cursor"] >= len(user["rows"]):
+            return None
+        row = user["rows"][user["cursor"]]
+        user["cursor"] += 1
+        return row
+
+
+def insert(user: dict):
+    row = next_row(user)
+    if row is None:
+        return "skipped"
+    try:
+        result = asyncio.run(KG_construction.ingest_entry(row["interaction"], user_name=row["user"],
+                                                          reference_date=row["date"]))
+    except KG_construction.NearDuplicateEntry:
+        return "flagged"
+    return "insert" if result is not None else "duplicate"
+
+
+def ask(user: dict, rng: random.Random):
+    if not user["questions"]:
+        return "skipped"
+    question = utils.process_date(text=rng.choice(user["questions"]), current_date=user["rows"][0]["date"])
+    GraphRAG.answer_timeline(question, user_name=user["name"])
+    return "question"
+
+
+def percentile(values: list, q: float) -> float:
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+def size_profile(samples: list, buckets: int) -> list:
+    """
+    Mean retrieval time per graph-size bucket.
+    """
+    if not samples:
+        return []
+    samples = sorted(samples)
+    profile = []
+    for group in np.array_split(np.array(samples), min(buckets, len(samples))):
+        profile.append({
+            "chunks": int(np.mean([size for size, _ in group])),
+            "mean_ms": float(np.mean([seconds for _, seconds in group]) * 1000),
+            "p95_ms": percentile([seconds * 1000 for _, seconds in group], 95),
+        })
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DATA_DIR, help="Directory with profiles/ and qa/")
+    parser.add_argument("--operations", type=int, default=2000, help="Operations in the measured phase")
+    parser.add_argument("--preload", type=int, default=0, help="Entries inserted before the measured phase")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent simulated users")
+    parser.add_argument("--question-ratio", type=float, default=0.5, help="Fraction of operations that are questions")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated LLM latency in seconds")
+    parser.add_argument("--embedding-latency", type=float, default=0.0, help="Simulated embedding latency in seconds")
+    parser.add_argument("--dimensions", type=int, default=256, help="Embedding dimensions (3072 in production)")
+    parser.add_argument("--buckets", type=int, default=5, help="Graph-size buckets in the retrieval profile")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--report", help="Optional path of a JSON report")
+    args = parser.parse_args()
+
+    graph = LocalGraph(args.dimensions)
+    backends = FakeBackends(graph, args.llm_latency, args.embedding_latency)
+    install_fakes(graph, backends)
+
+    users = load_workload(args.data)
+    if not users:
+        raise SystemExit(f"No profiles found in {args.data}")
+    names = list(users)
+
+    # Grow the graph before measuring, spreading the entries across users
+    for index in range(args.preload):
+        insert(users[names[index % len(names)]])
+    graph.retrieval_samples = {"hybrid": [], "timeline": []}
+    answer_cache.clear()
+
+    latencies = {}
+    latencies_lock = threading.Lock()
+
+    def operation(index):
+        rng = random.Random(args.seed * 1_000_003 + index)
+        user = users[rng.choice(names)]
+        start = time.perf_counter()
+        kind = ask(user, rng) if rng.random() < args.question_ratio else insert(user)
+        elapsed = time.perf_counter() - start
+        with latencies_lock:
+            latencies.setdefault(kind, []).append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(operation, range(args.operations)))
+    duration = time.perf_counter() - start
+
+    report = {
+        "operations": args.operations,
+        "concurrency": args.concurrency,
+        "duration_s": duration,
+        "throughput_ops_s": args.operations / duration,
+        "graph_chunks": graph.size(),
+        "latency_ms": {
+            kind: {
+                "count": len(values),
+                "p50": percentile(values, 50) * 1000,
+                "p95": percentile(values, 95) * 1000,
+                "p99": percentile(values, 99) * 1000,
+                "max": max(values) * 1000,
+            } for kind, values in latencies.items()
+        },
+        "answer_cache": answer_cache.get_metrics(),
+        "retrieval_by_graph_size": {
+            mode: size_profile(samples, args.buckets) for mode, samples in graph.retrieval_samples.items()
+        },
+    }
+
+    print(f"{args.operations} operations in {duration:.2f} s ({report['throughput_ops_s']:.1f} ops/s), "
+          f"{args.concurrency} concurrent users, {graph.size()} chunks at the end")
+    for kind, stats in report["latency_ms"].items():
+        print(f"  {kind:<10} n={stats['count']:<6} p50={stats['p50']:8.2f} ms  p95={stats['p95']:8.2f} ms  "
+              f"p99={stats['p99']:8.2f} ms  max={stats['max']:8.2f} ms")
+    cache = report["answer_cache"]
+    print(f"  answer cache: {cache['hits']} hits, {cache['misses']} misses, {cache['invalidations']} invalidations "
+          f"(hit rate {cache['hit_rate']:.1%})")
+    for mode, profile in report["retrieval_by_graph_size"].items():
+        print(f"  {mode} retrieval time by graph size:")
+        for bucket in profile:
+            print(f"    {bucket['chunks']:>9} chunks  mean={bucket['mean_ms']:8.3f} ms  p95={bucket['p95_ms']:8.3f} ms")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+import GraphRAG
+
+
+def test_generate_answer_keeps_the_system_instruction(monkeypatch):
+    calls = []
+
+    def invoke(prompt, system_instruction=None):
+        calls.append((prompt, system_instruction))
+        return SimpleNamespace(content="Dentist at 3 PM.")
+
+    monkeypatch.setattr(GraphRAG, "get_llm_model", lambda: SimpleNamespace(invoke=invoke))
+
+    assert GraphRAG.generate_answer("What is planned on 2023-10-24?", ["Dentist at 3 PM"]) == "Dentist at 3 PM."
+    prompt, system_instruction = calls[0]
+    assert "Dentist at 3 PM" in prompt
+    assert system_instruction == GraphRAG.PROMPT_TEMPLATE.system_instructions
+
+
+def test_import_does_not_load_the_extraction_pipeline():
+    code = "import sys, GraphRAG; print('KG_construction' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,57 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+from neo4j_graphrag.experimental.components.types import Neo4jGraph, Neo4jNode, Neo4jRelationship
+from neo4j_graphrag.experimental.pipeline import Component, Pipeline
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from KG_construction import IngestionNeo4jWriter
+
+
+class RecordingDriver:
+    """
+    Minimal stand-in for neo4j.Driver that records the queries of the writer.
+    """
+
+    def __init__(self):
+        self._pool = SimpleNamespace(pool_config=SimpleNamespace())
+        self.queries = []
+
+    def execute_query(self, query, parameters_=None, **kwargs):
+        if "dbms.components" in query:
+            return [{"versions": ["5.26.0"], "edition": "community"}], None, None
+        self.queries.append((query, parameters_ or {}))
+        return [], None, None
+
+
+class GraphSource(Component):
+    """
+    Emit a fixed graph, in place of the extractor.
+    """
+
+    async def run(self, text: str) -> Neo4jGraph:
+        return Neo4jGraph(
+            nodes=[
+                Neo4jNode(id="chunk-0", label="Chunk", properties={"text": text}),
+                Neo4jNode(id="activity-0", label="Activity", properties={"name": "Dentist", "onDate": "2023-10-24"}),
+            ],
+            relationships=[Neo4jRelationship(start_node_id="activity-0", end_node_id="chunk-0", type="FROM_CHUNK")],
+        )
+
+
+def test_ingestion_writer_in_pipeline_stamps_every_node():
+    driver = RecordingDriver()
+    pipeline = Pipeline()
+    pipeline.add_component(GraphSource(), "source")
+    pipeline.add_component(IngestionNeo4jWriter(driver=driver, ingestion_id="abc123"), "writer")
+    pipeline.connect("source", "writer", input_config={"graph": "source"})
+
+    result = asyncio.run(pipeline.run({"source": {"text": "Dentist on 2023-10-24"}}))
+
+    assert result.result["writer"]["status"] == "SUCCESS"
+    rows = [row for _, parameters in driver.queries for row in parameters.get("rows", []) if "labels" in row]
+    assert {row["id"] for row in rows} == {"chunk-0", "activity-0"}
+    assert all(row["properties"]["ingestionId"] == "abc123" for row in rows)
@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import answer_cache
+
+QUESTION = [1.0, 0.0, 0.0]
+SIMILAR_QUESTION = [0.99, 0.1, 0.0]
+OTHER_QUESTION = [0.0, 1.0, 0.0]
+DAY = ["2023-10-24"]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    answer_cache.clear()
+    yield
+    answer_cache.clear()
+
+
+def test_hit_above_threshold():
+    answer_cache.store("Mateo", 1, QUESTION, DAY, "Dentist at 3 PM.")
+    assert answer_cache.lookup("Mateo", 1, SIMILAR_QUESTION, DAY) == "Dentist at 3 PM."
+    assert answer_cache.get_metrics()["hits"] == 1
+
+
+def test_miss_below_threshold():
+    answer_cache.store("Mateo", 1, QUESTION, DAY, "Dentist at 3 PM.")
+    assert answer_cache.lookup("Mateo", 1, OTHER_QUESTION, DAY) is None
+    assert answer_cache.lookup("Mateo", 1, SIMILAR_QUESTION, DAY, threshold=0.999) is None
+
+
+def test_other_users_do_not_share_answers():
+    answer_cache.store("Mateo", 1, QUESTION, DAY, "Dentist at 3 PM.")
+    assert answer_cache.lookup("Ella", 1, QUESTION, DAY) is None
+
+
+def test_date_mismatch_is_a_miss():
+    answer_cache.store("Mateo", 1, QUESTION, ["2023-10-24"], "Dentist at 3 PM.")
+    assert answer_cache.lookup("Mateo", 1, QUESTION, ["2023-10-25"]) is None
+    assert answer_cache.lookup("Mateo", 1, QUESTION, []) is None
+
+
+def test_new_version_invalidates_answers():
+    answer_cache.store("Mateo", 1, QUESTION, DAY, "Dentist at 3 PM.")
+    assert answer_cache.lookup("Mateo", 2, QUESTION, DAY) is None
+    assert answer_cache.get_metrics()["invalidations"] == 1
+    assert answer_cache.lookup("Mateo", 1, QUESTION, DAY) is None
+
+
+def test_store_with_older_version_is_rejected():
+    answer_cache.lookup("Mateo", 2, QUESTION, DAY)
+    answer_cache.store("Mateo", 2, OTHER_QUESTION, [], "Nothing planned.")
+    # Answer computed before the graph changed
+    answer_cache.store("Mateo", 1, QUESTION, DAY, "Stale answer.")
+    assert answer_cache.lookup("Mateo", 2, QUESTION, DAY) is None
+    assert answer_cache.get_metrics()["entries"] == 1
+
+
+def test_entries_are_capped_per_user():
+    for index in range(answer_cache.MAX_ENTRIES_PER_USER + 10):
+        answer_cache.store("Mateo", 1, [1.0, float(index)], [], f"Answer {index}")
+    assert answer_cache.get_metrics()["entries"] == answer_cache.MAX_ENTRIES_PER_USER
@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import utils
+from KG_construction import NEAR_DUPLICATE_THRESHOLD
+
+
+def similarity(first: str, second: str) -> float:
+    return utils.max_minhash_similarity(utils.minhash_signature(first), [utils.minhash_signature(second)])
+
+
+def test_minhash_identical_after_normalization():
+    entry = "I have a dentist appointment on 2023-10-24 at 3 PM."
+    assert similarity(entry, "  i have a Dentist appointment on 2023-10-24  at 3 PM.") == 1.0
+
+
+def test_minhash_rewording_is_near_duplicate():
+    first = "I have a dentist appointment on 2023-10-24 at 3 PM."
+    second = "I have a dentist appointment on 2023-10-24 at 3 PM"
+    assert similarity(first, second) >= NEAR_DUPLICATE_THRESHOLD
+    assert utils.temporal_facts(first) == utils.temporal_facts(second)
+
+
+def test_rescheduled_date_is_not_a_duplicate():
+    first = "I have a dentist appointment on 2023-10-24 at 3 PM."
+    second = "I have a dentist appointment on 2023-10-25 at 3 PM."
+    assert similarity(first, second) < 1.0
+    assert utils.temporal_facts(first) == ["15:00", "2023-10-24"]
+    assert utils.temporal_facts(second) == ["15:00", "2023-10-25"]
+
+
+def test_changed_time_is_not_a_duplicate():
+    # Close enough in text to pass a pure similarity threshold, told apart by the time
+    first = "Meeting with Dr. Smith tomorrow at 3 PM at the clinic."
+    second = "Meeting with Dr. Smith tomorrow at 5 PM at the clinic."
+    assert similarity(first, second) > 0.8
+    assert utils.temporal_facts(first) != utils.temporal_facts(second)
+
+
+def test_unrelated_entries_are_dissimilar():
+    first = "I went for a walk in the park with Anna this morning."
+    second = "I need to call my daughter about the birthday party on Sunday."
+    assert similarity(first, second) < 0.2
+
+
+def test_max_minhash_similarity_without_previous_entries():
+    assert utils.max_minhash_similarity(utils.minhash_signature("anything"), []) == 0.0
+
+
+def test_extract_times():
+    assert utils.extract_times("at 15:00, 3:30 pm, 12 a.m. and 9am") == ["15:00", "15:30", "00:00", "09:00"]